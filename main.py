@@ -1,15 +1,28 @@
 import requests
 from google.transit import gtfs_realtime_pb2
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import zipfile
+import hashlib
 import os
+import shutil
 from dotenv import load_dotenv
 import json
+import logging
 
 # Load environment variables
 load_dotenv()
 
+# Level names are case-insensitive; unknown values fall back to INFO
+log_level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+logging.basicConfig(level=log_level if isinstance(log_level, int) else logging.INFO)
+logger = logging.getLogger(__name__)
+
 # Load configuration
 with open("config.json", "r") as config_file:
     config = json.load(config_file)
@@ -23,96 +36,254 @@ GTFS_STATIC_URL = os.getenv("GTFS_STATIC_URL")
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 API_KEY = os.getenv("TOKEN")
 GTFS_DIR = "gtfs_data"  # Directory for GTFS files
-
-def check_gtfs_up_to_date(gtfs_url, local_zip="gtfs_static.zip"):
-    """Verify if the local GTFS files are up to date with the remote ones."""
+GTFS_ZIP_PATH = "gtfs_static.zip"  # Local copy of the static GTFS archive
+GTFS_META_PATH = "gtfs_static.meta.json"  # HTTP cache validators of the local archive
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # Bytes written per chunk while downloading the archive
+CSV_BLOCK_SIZE = 1 << 24  # Bytes parsed per batch when converting GTFS text files
+CSV_CHUNKSIZE = 500_000  # Rows parsed per chunk when a GTFS text file falls back to pandas
+LINE_CACHE_DIR = os.path.join(GTFS_DIR, "line_cache")  # Filtered schedules, dropped on every new archive
+LINE_TRIP_IDS_PATH = os.path.join(LINE_CACHE_DIR, "line_trip_ids.json")  # Trip IDs per line and archive version
+LINE_CACHE_VERSION = 3  # Bump when the layout of the cached schedules changes
+GTFS_TABLES = {  # Static files used by the bot and the columns kept from each
+    "trips.txt": ["trip_id", "route_id"],
+    "routes.txt": ["route_id", "route_short_name"],
+    "stops.txt": ["stop_id", "stop_name"],
+    "stop_times.txt": ["trip_id", "stop_id", "arrival_time", "departure_time"],
+}
+
+def load_gtfs_metadata(meta_path=GTFS_META_PATH):
+    """Load the cache validators (ETag, Last-Modified) and size of the local GTFS archive."""
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, "r") as meta_file:
+        return json.load(meta_file)
+
+def save_gtfs_metadata(headers, meta_path=GTFS_META_PATH):
+    """Persist the cache validators and size returned with the GTFS archive."""
+    metadata = {key: headers[key] for key in ("ETag", "Last-Modified", "Content-Length") if key in headers}
+    with open(meta_path, "w") as meta_file:
+        json.dump(metadata, meta_file)
+
+def check_gtfs_up_to_date(gtfs_url, stored_length):
+    """Compare the remote Content-Length header with the one stored at the last download, for servers that send no cache validators."""
     try:
         response = requests.head(gtfs_url, allow_redirects=True)
         response.raise_for_status()
-        remote_size = int(response.headers.get("Content-Length", 0))
-
-        if os.path.exists(local_zip):
-            local_size = os.path.getsize(local_zip)
-            if local_size == remote_size:
-                print("✅ GTFS files are up to date.")
-                return True
-        return False
+        return response.headers.get("Content-Length") == stored_length
     except Exception as e:
         print(f"❌ Error checking GTFS files: {e}")
         return False
 
+def use_local_gtfs():
+    """Keep the local archive, extracting it only if the Parquet tables are missing."""
+    print("✅ GTFS files are up to date.")
+    if not validate_gtfs_files(GTFS_DIR):
+        print("ℹ️ No download needed. Extracting existing files...")
+        extract_gtfs(GTFS_ZIP_PATH, GTFS_DIR)
+        print(f"✅ GTFS files extracted to {GTFS_DIR}.")
+
+def extract_gtfs(zip_path, gtfs_dir):
+    """Refresh the Parquet tables from the GTFS archive, streaming each needed member without writing it out."""
+    # Drop the line cache first: if conversion fails, nothing derived from the previous archive may survive
+    shutil.rmtree(LINE_CACHE_DIR, ignore_errors=True)
+    os.makedirs(gtfs_dir, exist_ok=True)
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        for name in zip_ref.namelist():
+            file = os.path.basename(name)
+            if file in GTFS_TABLES:
+                convert_gtfs_to_parquet(zip_ref, name, gtfs_table_path(gtfs_dir, file), GTFS_TABLES[file])
+    # Text files left behind by earlier versions are never read again
+    for file in GTFS_TABLES:
+        if os.path.exists(os.path.join(gtfs_dir, file)):
+            os.remove(os.path.join(gtfs_dir, file))
+
 def download_and_extract_gtfs(gtfs_url, force_download=False):
-    """Download and extract GTFS files if needed."""
+    """Download and extract GTFS files if the remote archive changed."""
     try:
-        if not force_download and check_gtfs_up_to_date(gtfs_url):
-            print("ℹ️ No download needed. Extracting existing files...")
-            if os.path.exists("gtfs_static.zip"):
-                with zipfile.ZipFile("gtfs_static.zip", "r") as zip_ref:
-                    zip_ref.extractall(GTFS_DIR)
-                print(f"✅ GTFS files extracted to {GTFS_DIR}.")
-            return
-
-        print(f"🔄 Downloading GTFS files from {gtfs_url}...")
-        response = requests.get(gtfs_url)
-        response.raise_for_status()
-
-        with open("gtfs_static.zip", "wb") as f:
-            f.write(response.content)
-
-        with zipfile.ZipFile("gtfs_static.zip", "r") as zip_ref:
-            zip_ref.extractall(GTFS_DIR)
+        print(f"🔄 Checking GTFS files at {gtfs_url}...")
+        headers = {}
+        if not force_download and os.path.exists(GTFS_ZIP_PATH):
+            metadata = load_gtfs_metadata()
+            if "ETag" in metadata:
+                headers["If-None-Match"] = metadata["ETag"]
+            if "Last-Modified" in metadata:
+                headers["If-Modified-Since"] = metadata["Last-Modified"]
+            # Without validators, fall back to comparing the archive size with a HEAD request
+            if not headers and "Content-Length" in metadata:
+                if check_gtfs_up_to_date(gtfs_url, metadata["Content-Length"]):
+                    use_local_gtfs()
+                    return
+
+        with requests.get(gtfs_url, headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                use_local_gtfs()
+                return
+            response.raise_for_status()
+
+            # Write to a temporary file so an interrupted download never replaces a valid archive
+            with open(GTFS_ZIP_PATH + ".part", "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(GTFS_ZIP_PATH + ".part", GTFS_ZIP_PATH)
+
+        extract_gtfs(GTFS_ZIP_PATH, GTFS_DIR)
+        save_gtfs_metadata(response.headers)
 
         print(f"✅ GTFS files downloaded and extracted to {GTFS_DIR}.")
     except Exception as e:
         print(f"❌ Error downloading or extracting GTFS files: {e}")
 
+def gtfs_table_path(gtfs_dir, file):
+    """Return the Parquet cache path of a GTFS text file."""
+    return os.path.join(gtfs_dir, os.path.splitext(file)[0] + ".parquet")
+
+def write_parquet_with_arrow(source, parquet_path, columns):
+    """Stream a GTFS text file into Parquet with Arrow's CSV reader, parsing only the given columns."""
+    reader = pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={column: pa.string() for column in columns}
+        )
+    )
+    with pq.ParquetWriter(parquet_path, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+def write_parquet_with_pandas(source, parquet_path, columns):
+    """Convert a GTFS text file into Parquet chunk by chunk with pandas, which pads rows missing trailing fields."""
+    chunks = pd.read_csv(source, usecols=columns, dtype=str, keep_default_na=False, chunksize=CSV_CHUNKSIZE)
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    with pq.ParquetWriter(parquet_path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk[columns], schema=schema, preserve_index=False))
+
+def convert_gtfs_to_parquet(zip_ref, name, parquet_path, columns):
+    """Store a GTFS table from the archive as Parquet so later runs skip CSV parsing."""
+    # Write to a temporary file so a failed conversion never leaves a truncated but valid table behind
+    part_path = parquet_path + ".part"
+    try:
+        try:
+            with zip_ref.open(name) as source:
+                write_parquet_with_arrow(source, part_path, columns)
+        except pa.ArrowInvalid as e:
+            # Arrow rejects rows that leave out trailing optional fields; pandas accepts them
+            print(f"⚠️ {name} could not be parsed with Arrow ({e}). Converting it with pandas...")
+            with zip_ref.open(name) as source:
+                write_parquet_with_pandas(source, part_path, columns)
+    except Exception:
+        # Drop the previous table too, so validate_gtfs_files reports the failure instead of mixing archives
+        for path in (part_path, parquet_path):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    os.replace(part_path, parquet_path)
+
 def validate_gtfs_files(gtfs_dir):
     """Check if all necessary GTFS files are present."""
-    required_files = ["trips.txt", "routes.txt", "stops.txt", "stop_times.txt"]
-    return all(os.path.exists(os.path.join(gtfs_dir, file)) for file in required_files)
+    return all(os.path.exists(gtfs_table_path(gtfs_dir, file)) for file in GTFS_TABLES)
 
 def get_line_trip_ids(gtfs_dir):
-    """Fetch trip IDs for the specified line."""
-    routes = pd.read_csv(os.path.join(gtfs_dir, "routes.txt"), usecols=["route_id", "route_short_name"], dtype=str)
-    trips = pd.read_csv(os.path.join(gtfs_dir, "trips.txt"), usecols=["trip_id", "route_id"], dtype=str)
+    """Fetch trip IDs for the specified line, memoized per GTFS archive version."""
+    metadata = load_gtfs_metadata()
+    key = hashlib.sha1(
+        json.dumps([LINE_NAME, metadata.get("ETag"), metadata.get("Last-Modified")]).encode()
+    ).hexdigest()
+    cached_trip_ids = {}
+    if os.path.exists(LINE_TRIP_IDS_PATH):
+        with open(LINE_TRIP_IDS_PATH, "r") as cache_file:
+            cached_trip_ids = json.load(cache_file)
+    if key in cached_trip_ids:
+        return set(cached_trip_ids[key])
+
+    routes = pd.read_parquet(gtfs_table_path(gtfs_dir, "routes.txt"), columns=["route_id", "route_short_name"])
+    trips = pd.read_parquet(gtfs_table_path(gtfs_dir, "trips.txt"), columns=["trip_id", "route_id"])
 
     line_route_ids = routes[routes["route_short_name"] == LINE_NAME]["route_id"]
     line_trips = trips[trips["route_id"].isin(line_route_ids)]
-    return set(line_trips["trip_id"])
-
-def normalize_stop_id(stop_id):
-    """Normalize stop IDs to align GTFS-RT and static formats."""
-    return stop_id.split(":")[0] if ":" in stop_id else stop_id
+    line_trip_ids = set(line_trips["trip_id"])
+
+    cached_trip_ids[key] = sorted(line_trip_ids)
+    os.makedirs(LINE_CACHE_DIR, exist_ok=True)
+    with open(LINE_TRIP_IDS_PATH, "w") as cache_file:
+        json.dump(cached_trip_ids, cache_file)
+    return line_trip_ids
+
+def normalize_stop_ids(stop_ids):
+    """Normalize a Series of stop IDs to align GTFS-RT and static formats."""
+    if stop_ids.empty:
+        return stop_ids
+    if isinstance(stop_ids.dtype, pd.CategoricalDtype):
+        # Normalize each distinct ID once and re-encode the rows
+        categories = stop_ids.cat.categories.to_series()
+        return stop_ids.map(dict(zip(categories, normalize_stop_ids(categories)))).astype("category")
+    return stop_ids.str.partition(":")[0]
 
 def filter_stops_and_times(gtfs_dir, line_trip_ids):
     """Filter stops and stop_times for the specified line."""
-    stops_df = pd.read_csv(os.path.join(gtfs_dir, "stops.txt"), usecols=["stop_id", "stop_name"], dtype=str)
-    stops_df["stop_id"] = stops_df["stop_id"].apply(normalize_stop_id)
+    stops_df = pd.read_parquet(gtfs_table_path(gtfs_dir, "stops.txt"), columns=["stop_id", "stop_name"])
+    stops_df["stop_id"] = normalize_stop_ids(stops_df["stop_id"])
     stops_df = stops_df[stops_df["stop_name"].isin(LINE_STOPS)]
 
-    stop_times_df = pd.read_csv(
-        os.path.join(gtfs_dir, "stop_times.txt"),
-        usecols=["trip_id", "stop_id", "arrival_time", "departure_time"],
-        dtype=str
-    )
-    stop_times_df["stop_id"] = stop_times_df["stop_id"].apply(normalize_stop_id)
-    stop_times_df = stop_times_df[
-        stop_times_df["trip_id"].isin(line_trip_ids) & stop_times_df["stop_id"].isin(stops_df["stop_id"])
-    ]
+    # The trip filter is pushed down to the Parquet scan, so only the line's rows are materialised.
+    # IDs are decoded as categoricals: one string per distinct ID, integer codes per row.
+    stop_times_df = pq.read_table(
+        gtfs_table_path(gtfs_dir, "stop_times.txt"),
+        columns=GTFS_TABLES["stop_times.txt"],
+        filters=pc.field("trip_id").isin(pa.array(list(line_trip_ids), type=pa.string())),
+        read_dictionary=["trip_id", "stop_id"]
+    ).to_pandas()
+    stop_times_df["trip_id"] = stop_times_df["trip_id"].cat.remove_unused_categories()
+    stop_times_df["stop_id"] = normalize_stop_ids(stop_times_df["stop_id"].cat.remove_unused_categories())
+    stop_times_df = stop_times_df[stop_times_df["stop_id"].isin(stops_df["stop_id"])]
+
+    # GTFS times are offsets from midnight and may exceed 24:00:00
+    stop_times_df["arrival_time"] = pd.to_timedelta(stop_times_df["arrival_time"], errors="coerce")
+    stop_times_df["departure_time"] = pd.to_timedelta(stop_times_df["departure_time"], errors="coerce")
+
+    # Drop trips that start and end at the same line stop, broadcasting the per-trip bounds back to the rows
+    trip_stops = stop_times_df.groupby("trip_id", observed=True)["stop_id"]
+    stop_times_df = stop_times_df[trip_stops.transform("first") != trip_stops.transform("last")]
+
+    # Keep the schedule ordered by departure so upcoming departures can be found by binary search
+    stop_times_df = stop_times_df.sort_values("departure_time", ignore_index=True)
 
-    trip_start_end = stop_times_df.groupby("trip_id").agg(
-        start_stop=pd.NamedAgg(column="stop_id", aggfunc="first"),
-        end_stop=pd.NamedAgg(column="stop_id", aggfunc="last")
-    ).reset_index()
+    print(f"✅ Filtered {len(stops_df)} stops and {len(stop_times_df)} schedules for {LINE_NAME}.")
+    return stops_df, stop_times_df
 
-    invalid_trips = trip_start_end[trip_start_end["start_stop"] == trip_start_end["end_stop"]]["trip_id"]
-    stop_times_df = stop_times_df[~stop_times_df["trip_id"].isin(invalid_trips)]
+def line_cache_paths():
+    """Return the cached stops and stop_times paths for the configured line."""
+    key = hashlib.sha1(json.dumps([LINE_CACHE_VERSION, LINE_NAME, LINE_STOPS]).encode()).hexdigest()[:12]
+    return (
+        os.path.join(LINE_CACHE_DIR, f"stops_{key}.parquet"),
+        os.path.join(LINE_CACHE_DIR, f"stop_times_{key}.parquet"),
+    )
 
-    print(f"✅ Filtered {len(stops_df)} stops and {len(stop_times_df)} schedules for {LINE_NAME}.")
+def load_line_schedule(gtfs_dir, line_trip_ids):
+    """Load the filtered stops and stop_times for the line, filtering the GTFS tables only once per archive."""
+    stops_path, stop_times_path = line_cache_paths()
+    if os.path.exists(stops_path) and os.path.exists(stop_times_path):
+        stops_df = pd.read_parquet(stops_path, columns=GTFS_TABLES["stops.txt"])
+        stop_times_df = pd.read_parquet(stop_times_path, columns=GTFS_TABLES["stop_times.txt"])
+        print(f"✅ Loaded {len(stops_df)} stops and {len(stop_times_df)} schedules for {LINE_NAME} from cache.")
+        return stops_df, stop_times_df
+
+    stops_df, stop_times_df = filter_stops_and_times(gtfs_dir, line_trip_ids)
+    os.makedirs(LINE_CACHE_DIR, exist_ok=True)
+    # The Parquet schema keeps the categorical IDs and timedelta times, so nothing is re-inferred on load
+    stops_df.to_parquet(stops_path, index=False, compression="zstd")
+    stop_times_df.to_parquet(stop_times_path, index=False, compression="zstd")
     return stops_df, stop_times_df
 
-def fetch_realtime_data(line_trip_ids, stops_df, stop_times_df):
-    """Fetch GTFS-RT data and combine it with static schedules."""
+def upcoming_departures(stop_times_df, count=5):
+    """Return the next scheduled departures from a schedule sorted by departure time."""
+    now = pd.Timestamp.now()
+    start = stop_times_df["departure_time"].searchsorted(now - now.normalize())
+    return stop_times_df.iloc[start:start + count]
+
+def fetch_gtfs_rt_feed():
+    """Fetch and parse the GTFS-RT feed."""
     headers = {"Authorization": f"Bearer {API_KEY}"}
     try:
         print("🔄 Fetching GTFS-RT data...")
@@ -121,47 +292,57 @@ def fetch_realtime_data(line_trip_ids, stops_df, stop_times_df):
 
         feed = gtfs_realtime_pb2.FeedMessage()
         feed.ParseFromString(response.content)
+        return feed
+    except Exception as e:
+        print(f"❌ Error fetching real-time data: {e}")
+        send_discord_notification(f"❌ Error fetching real-time data: {e}")
+        return None
 
-        trip_updates = []
+def process_realtime_data(feed, line_trip_ids, stops_df, stop_times_df):
+    """Combine GTFS-RT data with static schedules and report delays."""
+    if feed is None:
+        return
+    try:
+        # Collect the updates column by column; normalization and joins then run vectorized
+        trip_updates = {"trip_id": [], "stop_id": [], "arrival_delay": [], "departure_delay": []}
+        trip_ids = trip_updates["trip_id"]
+        stop_ids = trip_updates["stop_id"]
+        arrival_delays = trip_updates["arrival_delay"]
+        departure_delays = trip_updates["departure_delay"]
         for entity in feed.entity:
-            if entity.trip_update:
-                trip_id = entity.trip_update.trip.trip_id.split(":")[-1]
-                for stop_time_update in entity.trip_update.stop_time_update:
-                    stop_id = normalize_stop_id(stop_time_update.stop_id)
-                    arrival_delay = stop_time_update.arrival.delay if stop_time_update.HasField("arrival") else 0
-                    departure_delay = stop_time_update.departure.delay if stop_time_update.HasField("departure") else 0
-
-                    trip_updates.append({
-                        "trip_id": trip_id,
-                        "stop_id": stop_id,
-                        "arrival_delay": arrival_delay,
-                        "departure_delay": departure_delay,
-                    })
+            # A message field is always truthy, so presence has to be checked explicitly
+            if not entity.HasField("trip_update"):
+                continue
+            trip_update = entity.trip_update
+            trip_id = trip_update.trip.trip_id.split(":")[-1]
+            if trip_id not in line_trip_ids:
+                continue
+            for stop_time_update in trip_update.stop_time_update:
+                has_field = stop_time_update.HasField
+                trip_ids.append(trip_id)
+                stop_ids.append(stop_time_update.stop_id)
+                arrival_delays.append(stop_time_update.arrival.delay if has_field("arrival") else 0)
+                departure_delays.append(stop_time_update.departure.delay if has_field("departure") else 0)
 
         realtime_df = pd.DataFrame(trip_updates)
-        print("🛠 Diagnostic - Extracted trip_updates:")
-        print(realtime_df.head())
+        realtime_df["stop_id"] = normalize_stop_ids(realtime_df["stop_id"])
+        logger.debug("🛠 Diagnostic - Extracted trip_updates:\n%s", realtime_df.head())
 
         if realtime_df.empty:
             print(f"✅ No active {LINE_NAME} trips found.")
             print("⏰ Current schedule without delays:")
-            print(stop_times_df.head())
+            print(upcoming_departures(stop_times_df))
             return
 
-        merged_df = realtime_df.merge(stops_df, on="stop_id", how="left")
-        merged_df = merged_df.merge(stop_times_df, on=["trip_id", "stop_id"], how="left")
+        # Platforms of a station share one normalized ID, so keep a single name per stop
+        stop_names = stops_df.drop_duplicates("stop_id").set_index("stop_id")["stop_name"]
+        merged_df = realtime_df.assign(stop_name=realtime_df["stop_id"].map(stop_names))
+        schedule_df = stop_times_df.set_index(["trip_id", "stop_id"]).sort_index()
+        merged_df = merged_df.join(schedule_df, on=["trip_id", "stop_id"], how="left")
 
-        today = datetime.now().date()
-        merged_df["arrival_time"] = pd.to_datetime(
-            today.strftime("%Y-%m-%d") + " " + merged_df["arrival_time"],
-            format="%Y-%m-%d %H:%M:%S",
-            errors="coerce"
-        )
-        merged_df["departure_time"] = pd.to_datetime(
-            today.strftime("%Y-%m-%d") + " " + merged_df["departure_time"],
-            format="%Y-%m-%d %H:%M:%S",
-            errors="coerce"
-        )
+        midnight = pd.Timestamp(datetime.now().date())
+        merged_df["arrival_time"] = midnight + merged_df["arrival_time"]
+        merged_df["departure_time"] = midnight + merged_df["departure_time"]
 
         merged_df["real_arrival_time"] = merged_df["arrival_time"] + pd.to_timedelta(merged_df["arrival_delay"], unit="s")
         merged_df["real_departure_time"] = merged_df["departure_time"] + pd.to_timedelta(merged_df["departure_delay"], unit="s")
@@ -172,7 +353,7 @@ def fetch_realtime_data(line_trip_ids, stops_df, stop_times_df):
         if not delayed_trips.size:
             print(f"✅ No significant delays for the {LINE_NAME} line.")
             print("⏰ Current schedule without delays:")
-            print(stop_times_df.head())
+            print(upcoming_departures(stop_times_df))
             return
 
         delayed_df = merged_df[merged_df["trip_id"].isin(delayed_trips)]
@@ -187,16 +368,18 @@ def fetch_realtime_data(line_trip_ids, stops_df, stop_times_df):
             start = group.iloc[0]["stop_name"]
             end = group.iloc[-1]["stop_name"]
             message += f"\n**From {start} to {end}**\n"
-            for _, row in group.iterrows():
-                arrival = row['real_arrival_time'].strftime('%H:%M') if pd.notna(row['real_arrival_time']) else "N/A"
-                message += f"- **{row['stop_name']}**: Arrival: {arrival}, Delay: +{row['arrival_delay'] // 60} min\n"
+            for stop_name, real_arrival_time, arrival_delay in zip(
+                group["stop_name"], group["real_arrival_time"], group["arrival_delay"]
+            ):
+                arrival = real_arrival_time.strftime('%H:%M') if pd.notna(real_arrival_time) else "N/A"
+                message += f"- **{stop_name}**: Arrival: {arrival}, Delay: +{arrival_delay // 60} min\n"
 
         send_discord_notification(message)
         print(message)
 
     except Exception as e:
-        print(f"❌ Error fetching real-time data: {e}")
-        send_discord_notification(f"❌ Error fetching real-time data: {e}")
+        print(f"❌ Error processing real-time data: {e}")
+        send_discord_notification(f"❌ Error processing real-time data: {e}")
 
 def send_discord_notification(message):
     """Send a message to the Discord webhook."""
@@ -211,11 +394,15 @@ if __name__ == "__main__":
     if not GTFS_STATIC_URL:
         print("❌ GTFS_STATIC_URL is not set in the environment.")
     else:
+        # A new archive can take minutes to download and convert, so the feed is only requested afterwards
         download_and_extract_gtfs(GTFS_STATIC_URL)
 
         if validate_gtfs_files(GTFS_DIR):
-            line_trip_ids = get_line_trip_ids(GTFS_DIR)
-            stops, stop_times = filter_stops_and_times(GTFS_DIR, line_trip_ids)
-            fetch_realtime_data(line_trip_ids, stops, stop_times)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # The realtime feed does not depend on the line schedule, so fetch it while the schedule is loaded
+                feed_future = executor.submit(fetch_gtfs_rt_feed)
+                line_trip_ids = get_line_trip_ids(GTFS_DIR)
+                stops, stop_times = load_line_schedule(GTFS_DIR, line_trip_ids)
+                process_realtime_data(feed_future.result(), line_trip_ids, stops, stop_times)
         else:
             print("❌ Required GTFS files are missing.")